@@ -1,9 +1,50 @@
 """Sample Flask app using Huxley library, with a few extra features."""
-from flask import Flask, render_template, send_from_directory, redirect
-from nationalrail import Huxley
+import re
+from dataclasses import replace
+
+from flask import (
+    Flask,
+    Response,
+    abort,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_from_directory,
+)
+from nationalrail import (
+    METRICS,
+    STATIONS,
+    HuxleyError,
+    HuxleyNotFound,
+    ServiceCache,
+    View,
+    canonical_filter_crs,
+    fetch,
+    service_from_details,
+)
 
 app = Flask(__name__)
 app.config["TEMPLATES_AUTO_RELOAD"] = True
+app.jinja_env.globals["stations"] = STATIONS
+
+# departures.jinja renders at most ten lines; modern.jinja shows five boards.
+DEPARTURES = View(rows=10)
+STATION = View(rows=5, expand=True)
+
+# Both pages for a station are planned together, so they share one fetch.
+VIEWS: list = [DEPARTURES, STATION]
+
+services = ServiceCache()
+
+# Service pages are linked by serviceIdGuid; anything else is not worth a fetch.
+GUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I)
+
+
+def render(template: str, **context) -> str:
+    """Render a template, timing it."""
+    with METRICS.timer("template_render", template=template):
+        return render_template(template, **context)
 
 
 @app.route("/")
@@ -14,16 +55,67 @@ def default():
 
 @app.route("/departures/<crs>")
 def departures(crs: str):
-    """Show departures for a station."""
-    station = Huxley(crs=crs, rows=10, endpoint="departures")
-    return render_template("departures.jinja", station=station)
+    """Show departures for a station, optionally filtered with ?to=<crs>,..."""
+    if not STATIONS.is_valid(crs):
+        abort(404)
+    try:
+        to: str = canonical_filter_crs(request.args.get("to", ""))
+    except ValueError:
+        abort(404)
+    if to:
+        view = replace(DEPARTURES, filter_crs=to)
+        station = fetch(crs, [view])[view]
+    else:
+        station = fetch(crs, VIEWS)[DEPARTURES]
+    if not station.stale:
+        services.prefetch(station.path, [t.guid for t in station.train_services])
+    return render("departures.jinja", station=station)
 
 
 @app.route("/station/<crs>")
 def station(crs: str):
     """Show station details."""
-    station = Huxley(crs=crs, rows=5, endpoint="departures", expand=True)
-    return render_template("modern.jinja", station=station)
+    if not STATIONS.is_valid(crs):
+        abort(404)
+    station = fetch(crs, VIEWS)[STATION]
+    if not station.stale:
+        services.prefetch(station.path, [t.guid for t in station.train_services])
+    return render("modern.jinja", station=station)
+
+
+@app.route("/service/<guid>")
+def service(guid: str):
+    """Show the calling points of a single service."""
+    if not GUID.fullmatch(guid):
+        abort(404)
+    details = services.get(guid)
+    station = {"train_services": [service_from_details(details)]}
+    return render("station.jinja", station=station)
+
+
+@app.route("/stations")
+def stations():
+    """Suggest stations matching ?q=<code or name> for autocomplete."""
+    matches = STATIONS.search(request.args.get("q", ""))
+    return jsonify([{"crs": crs, "name": name} for crs, name in matches])
+
+
+@app.route("/metrics")
+def metrics():
+    """Export timings and counters in Prometheus text format."""
+    return Response(METRICS.prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@app.errorhandler(HuxleyError)
+def upstream_unavailable(error: HuxleyError):
+    """Report upstream failures with no stale fallback as a 503."""
+    return "Departure information is temporarily unavailable.", 503
+
+
+@app.errorhandler(HuxleyNotFound)
+def upstream_not_found(error: HuxleyNotFound):
+    """Report boards and services the API does not know, e.g. expired ones."""
+    return "No such board or service.", 404
 
 
 @app.route("/fonts/<path:path>")
@@ -0,0 +1,18 @@
+"""Offline benchmarks for the parsing and rendering hot paths."""
+import json
+import os
+from typing import Dict
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES: str = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def load_fixtures() -> Dict[str, dict]:
+    """Return every recorded Huxley response, keyed by fixture name."""
+    fixtures: dict = {}
+    for filename in sorted(os.listdir(FIXTURES)):
+        name, extension = os.path.splitext(filename)
+        if extension == ".json":
+            with open(os.path.join(FIXTURES, filename), encoding="utf-8") as file:
+                fixtures[name] = json.load(file)
+    return fixtures
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""Time parsing and rendering hot paths against recorded Huxley responses.
+
+Run from the repository root, as the renderers load fonts from ./fonts:
+
+    python -m benchmarks.bench              # compare against baseline.json
+    python -m benchmarks.bench --save       # record a new baseline
+"""
+import json
+import os
+import statistics
+import sys
+import timeit
+from functools import partial
+from typing import Callable, Iterator, Tuple
+
+import click
+
+import touchscreen
+from app import app
+from benchmarks import ROOT, load_fixtures
+from nationalrail import Huxley
+
+BASELINE: str = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# A benchmark regresses if its fastest run slows by more than this factor.
+THRESHOLD: float = 1.5
+
+
+def board(services: dict) -> Huxley:
+    """Return a Huxley board wrapping a recorded response."""
+    return Huxley(crs=services["crs"], rows=10, services=services)
+
+
+def parse(services: dict, attribute: str) -> list:
+    """Parse one kind of service from a freshly wrapped board."""
+    return getattr(board(services), attribute)
+
+
+def cases() -> Iterator[Tuple[str, Callable[[], object]]]:
+    """Yield a (name, callable) pair for every benchmark."""
+    fixtures: dict = load_fixtures()
+    departures = app.jinja_env.get_template("departures.jinja")
+    modern = app.jinja_env.get_template("modern.jinja")
+
+    for name, services in fixtures.items():
+        for attribute in ("train_services", "bus_services", "nrcc_messages"):
+            yield f"parse.{attribute}[{name}]", partial(parse, services, attribute)
+        yield f"touchscreen.draw_station_board[{name}]", partial(
+            touchscreen.draw_station_board, board(services)
+        )
+        yield f"jinja.departures[{name}]", partial(
+            departures.render, station=board(services)
+        )
+        yield f"jinja.modern[{name}]", partial(modern.render, station=board(services))
+
+    message: str = board(fixtures["nrcc"]).nrcc_messages[0]
+    yield "touchscreen.get_multiline_text", partial(
+        touchscreen.get_multiline_text, message, touchscreen.Font.DOTMATRIX, 432
+    )
+
+    # The inky library is only installed on the Raspberry Pi it drives.
+    try:
+        import inky_phat
+    except ImportError:
+        return
+
+    for name, services in fixtures.items():
+        yield f"inky.draw_platform_board[{name}]", partial(
+            inky_phat.draw_platform_board, services
+        )
+        yield f"inky.draw_station_board[{name}]", partial(
+            inky_phat.draw_station_board, services
+        )
+        if name in ("expanded", "cancelled", "nrcc"):
+            service: dict = inky_phat.parse_service_board(services)
+            yield f"inky.draw_service_board[{name}]", partial(
+                inky_phat.draw_service_board, service
+            )
+    yield "inky.get_multiline_text", partial(
+        inky_phat.get_multiline_text, message, inky_phat.DOTMATRIX, 432
+    )
+
+
+def measure(function: Callable[[], object], repeat: int) -> dict:
+    """Return the minimum and median seconds per call of `function`."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    times: list = [total / number for total in timer.repeat(repeat, number)]
+    return {"min": min(times), "median": statistics.median(times), "number": number}
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """Return a description of every benchmark slower than its threshold."""
+    regressions: list = []
+    thresholds: dict = baseline.get("thresholds", {})
+    for name, result in results.items():
+        if name not in baseline["results"]:
+            continue
+        before: float = baseline["results"][name]["min"]
+        limit: float = thresholds.get(name, baseline.get("threshold", THRESHOLD))
+        ratio: float = result["min"] / before
+        if ratio > limit:
+            regressions.append(f"{name}: {ratio:.2f}x slower (limit {limit:.2f}x)")
+    return regressions
+
+
+@click.command()
+@click.option("--save", is_flag=True, help="Write results as the new baseline.")
+@click.option("--output", default="", help="Also write results to this file.")
+@click.option("--only", default="", help="Only run benchmarks containing this.")
+@click.option("--repeat", default=5, help="Timing runs per benchmark.")
+def run(save: bool, output: str, only: str, repeat: int) -> None:
+    """Run the benchmarks and check them against the baseline."""
+    os.makedirs("dist", exist_ok=True)
+    results: dict = {}
+    for name, function in cases():
+        if only in name:
+            results[name] = measure(function, repeat)
+            click.echo(f"{name:<48} {results[name]['median'] * 1000:>10.3f} ms")
+
+    document: dict = {"threshold": THRESHOLD, "results": results}
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2, sort_keys=True)
+
+    if save:
+        if os.path.exists(BASELINE):
+            with open(BASELINE, encoding="utf-8") as file:
+                previous: dict = json.load(file)
+            document["threshold"] = previous.get("threshold", THRESHOLD)
+            document["thresholds"] = previous.get("thresholds", {})
+        with open(BASELINE, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2, sort_keys=True)
+            file.write("\n")
+        return
+
+    if os.path.exists(BASELINE):
+        with open(BASELINE, encoding="utf-8") as file:
+            regressions: list = compare(results, json.load(file))
+        for regression in regressions:
+            click.echo(f"REGRESSION {regression}", err=True)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
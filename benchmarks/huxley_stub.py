@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+"""Serve recorded Huxley responses locally, for load testing without the API.
+
+Point the app at it with HUXLEY_URL, e.g.:
+
+    python -m benchmarks.huxley_stub --fixture busy --latency 150 --jitter 50
+    HUXLEY_URL=http://127.0.0.1:8080 ACCESS_TOKEN=stub flask run
+"""
+import copy
+import datetime
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import click
+
+from benchmarks import load_fixtures
+
+BOARD = re.compile(r"^/(departures|arrivals|all)/(\w+)(?:/(to|from)/([\w,]+))?/(\d+)$")
+SERVICE = re.compile(r"^/service/([\w%+/=-]+)$")
+
+
+class Stub:
+    """Shared state for the stand-in server: fixture, faults and counters."""
+
+    def __init__(
+        self, fixture: dict, latency: float, jitter: float, error_rate: float
+    ) -> None:
+        """Initialise the Stub class."""
+        self.fixture: dict = fixture
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.error_rate: float = error_rate
+        self.requests: int = 0
+        self.errors: int = 0
+        self._lock = threading.Lock()
+        return None
+
+    def delay(self) -> float:
+        """Return how long to wait before responding, in seconds."""
+        jitter: float = random.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.latency + jitter) / 1000
+
+    def fail(self) -> bool:
+        """Count a request and return True if it should fail."""
+        failed: bool = random.random() < self.error_rate
+        with self._lock:
+            self.requests = self.requests + 1
+            self.errors = self.errors + int(failed)
+        return failed
+
+    def now(self) -> str:
+        """Return the current time, so generatedAt progresses as live data does."""
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    def board(self, rows: int, expand: bool) -> dict:
+        """Return the fixture trimmed to `rows`, expanded only if asked."""
+        board: dict = copy.deepcopy(self.fixture)
+        board["generatedAt"] = self.now()
+        for key in ("trainServices", "busServices"):
+            if board.get(key) is not None:
+                board[key] = board[key][:rows]
+                if not expand:
+                    for service in board[key]:
+                        service["subsequentCallingPoints"] = None
+        return board
+
+    def service(self, guid: str):
+        """Return service details for a fixture service, or None."""
+        for service in self.fixture.get("trainServices") or []:
+            if guid in (service["serviceIdGuid"], service["serviceID"]):
+                details: dict = copy.deepcopy(service)
+                details["generatedAt"] = self.now()
+                details["locationName"] = self.fixture["locationName"]
+                details["crs"] = self.fixture["crs"]
+                return details
+        return None
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Answer Huxley API requests from the server's Stub."""
+
+    stub: Stub
+
+    def do_GET(self) -> None:
+        """Respond to a GET request."""
+        url = urlsplit(self.path)
+        if url.path == "/stats":
+            self.send_json(
+                200, {"requests": self.stub.requests, "errors": self.stub.errors}
+            )
+            return
+
+        time.sleep(self.stub.delay())
+        if self.stub.fail():
+            self.send_json(503, {"message": "Injected failure."})
+            return
+
+        query: dict = parse_qs(url.query)
+        expand: bool = query.get("expand", ["False"])[0].lower() == "true"
+        board = BOARD.match(url.path)
+        service = SERVICE.match(url.path)
+        details = self.stub.service(service.group(1)) if service else None
+        if board:
+            self.send_json(200, self.stub.board(int(board.group(5)), expand))
+        elif details:
+            self.send_json(200, details)
+        else:
+            self.send_json(404, {"message": f"No route for {url.path}."})
+
+    def send_json(self, status: int, document: dict) -> None:
+        """Send a JSON response."""
+        body: bytes = json.dumps(document).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Keep the console quiet under load."""
+        return None
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Address to listen on.")
+@click.option("--port", default=8080, help="Port to listen on.")
+@click.option("--fixture", default="busy", help="Fixture to serve for boards.")
+@click.option("--latency", default=0.0, help="Mean response latency in ms.")
+@click.option("--jitter", default=0.0, help="Random latency variation in ms.")
+@click.option("--error-rate", default=0.0, help="Fraction of requests to fail.")
+def serve(
+    host: str, port: int, fixture: str, latency: float, jitter: float, error_rate: float
+) -> None:
+    """Serve the Huxley API from recorded fixtures."""
+    Handler.stub = Stub(load_fixtures()[fixture], latency, jitter, error_rate)
+    server = ThreadingHTTPServer((host, port), Handler)
+    click.echo(f"Serving {fixture} fixture on http://{host}:{port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    serve()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""Drive the Flask app's board pages at a fixed concurrency and report.
+
+Run the app against the stand-in server, then e.g.:
+
+    python -m benchmarks.loadtest --concurrency 16 --duration 30
+"""
+import statistics
+import threading
+import time
+from typing import List
+
+import click
+import requests
+
+
+class Results:
+    """Latencies and failures collected from every worker."""
+
+    def __init__(self) -> None:
+        """Initialise the Results class."""
+        self.latencies: list = []
+        self.failures: int = 0
+        self._lock = threading.Lock()
+        return None
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Record one request."""
+        with self._lock:
+            self.latencies.append(latency)
+            self.failures = self.failures + int(not ok)
+
+
+def percentile(values: list, percent: float) -> float:
+    """Return the value below which `percent` of sorted `values` fall."""
+    index: int = min(len(values) - 1, int(len(values) * percent / 100))
+    return values[index]
+
+
+def upstream_requests(stub: str) -> int:
+    """Return how many requests the stand-in server has answered."""
+    return requests.get(f"{stub}/stats", timeout=5).json()["requests"]
+
+
+def worker(app: str, paths: List[str], deadline: float, results: Results) -> None:
+    """Request pages in turn, on one connection, until the deadline."""
+    session = requests.Session()
+    index: int = 0
+    while time.monotonic() < deadline:
+        path: str = paths[index % len(paths)]
+        index = index + 1
+        started: float = time.perf_counter()
+        try:
+            ok: bool = session.get(f"{app}{path}", timeout=30).status_code == 200
+        except requests.RequestException:
+            ok = False
+        results.record(time.perf_counter() - started, ok)
+
+
+@click.command()
+@click.option("--app", default="http://127.0.0.1:5000", help="Flask app URL.")
+@click.option("--stub", default="http://127.0.0.1:8080", help="Stand-in API URL.")
+@click.option("--crs", default="wok,wat,gld", help="Comma-separated stations.")
+@click.option("--concurrency", default=8, help="Simultaneous clients.")
+@click.option("--duration", default=10.0, help="Seconds to run for.")
+def run(app: str, stub: str, crs: str, concurrency: int, duration: float) -> None:
+    """Load test /departures/<crs> and /station/<crs>."""
+    pages: tuple = ("departures", "station")
+    paths: list = [f"/{page}/{code}" for code in crs.split(",") for page in pages]
+    results = Results()
+    before: int = upstream_requests(stub)
+    deadline: float = time.monotonic() + duration
+    threads: list = []
+    for index in range(concurrency):
+        # Stagger the starting page so clients don't move through boards in step.
+        start: int = index % len(paths)
+        order: list = paths[start:] + paths[:start]
+        arguments: tuple = (app, order, deadline, results)
+        threads.append(threading.Thread(target=worker, args=arguments))
+    started: float = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed: float = time.perf_counter() - started
+    upstream: int = upstream_requests(stub) - before
+
+    latencies: list = sorted(results.latencies)
+    total: int = len(latencies)
+    if not total:
+        raise click.ClickException("No requests completed.")
+    click.echo(f"Requests:      {total} ({results.failures} failed)")
+    click.echo(f"Throughput:    {total / elapsed:.1f} req/s")
+    for label, percent in (("p50", 50), ("p90", 90), ("p99", 99)):
+        click.echo(f"Latency {label}:   {percentile(latencies, percent) * 1000:.1f} ms")
+    click.echo(f"Latency max:   {latencies[-1] * 1000:.1f} ms")
+    click.echo(f"Latency mean:  {statistics.mean(latencies) * 1000:.1f} ms")
+    click.echo(f"Upstream:      {upstream} calls ({upstream / total:.3f} per request)")
+
+
+if __name__ == "__main__":
+    run()  # pylint: disable=no-value-for-parameter
@@ -1,23 +1,155 @@
 #!/usr/bin/env python3
 
 """Show rail departures using the Huxley library."""
+import time
+from typing import Optional
+
 import click
-from rich import box
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
 from rich.padding import Padding
-from rich.style import Style
 from rich.table import Table
+from rich.text import Text
+
+from nationalrail import (
+    METRICS,
+    Huxley,
+    HuxleyError,
+    complete_crs,
+    validate_crs,
+    validate_filter_crs,
+)
+from nationalrail.nationalrail import CACHE, Service
+
 
-from nationalrail import Huxley
+def validate_interval(ctx, param, value: float) -> float:
+    """Reject watch intervals shorter than boards are cached for."""
+    if value < CACHE.ttl:
+        raise click.BadParameter(
+            f"must be at least {CACHE.ttl:g} seconds, as boards are cached for "
+            "that long (see BOARD_CACHE_TTL)."
+        )
+    return value
 
 
 @click.command()
-@click.option("--crs", default="wok", help="CRS code for station.")
-def get_departures(crs: str) -> None:
+@click.option(
+    "--crs",
+    default="wok",
+    help="CRS code for station.",
+    callback=validate_crs,
+    shell_complete=complete_crs,
+)
+@click.option(
+    "--to",
+    default="",
+    help="Only show services calling at this CRS.",
+    callback=validate_filter_crs,
+    shell_complete=complete_crs,
+)
+@click.option("--watch", is_flag=True, help="Keep the board open and up to date.")
+@click.option(
+    "--interval",
+    default=max(30.0, CACHE.ttl),
+    type=float,
+    help="Seconds between updates when watching.",
+    callback=validate_interval,
+)
+@click.option("--timings", is_flag=True, help="Print a timing summary to stderr.")
+def get_departures(
+    crs: str, to: str, watch: bool, interval: float, timings: bool
+) -> None:
     """Display plain-text table of upcoming departures from a named station."""
-    station = Huxley(crs=crs, rows=10, endpoint="departures")
+    METRICS.enabled = METRICS.enabled or timings
+    station = get_station(crs, to)
     console = Console(width=80)
 
+    if watch:
+        try:
+            watch_board(console, station, interval)
+        except KeyboardInterrupt:
+            pass
+    else:
+        with METRICS.timer("render", output="rich"):
+            console.print(draw_board(station))
+
+    if timings:
+        click.echo(METRICS.summary(), err=True)
+
+
+def get_station(crs: str, to: str) -> Huxley:
+    """Return the departure board for a station."""
+    try:
+        return Huxley(crs=crs, rows=10, endpoint="departures", filter_crs=to)
+    except HuxleyError as error:
+        raise click.ClickException(str(error)) from error
+
+
+def watch_board(console: Console, station: Huxley, interval: float) -> None:
+    """Redraw the board in place, only when it changes, until interrupted.
+
+    Every poll reuses the same pooled connection. Rows for unchanged services
+    are reused rather than rebuilt, and services whose details have changed
+    since the last poll are highlighted until the next one.
+    """
+    states: dict = {}
+    cells: dict = {}
+    drawn: Optional[tuple] = None
+
+    with Live(console=console, auto_refresh=False) as live:
+        while True:
+            current: dict = {
+                train.guid: service_state(train) for train in station.train_services
+            }
+            changed: frozenset = frozenset(
+                guid
+                for guid, state in current.items()
+                if guid in states and states[guid] != state
+            )
+            signature: tuple = (tuple(current.items()), changed, station.stale)
+            if signature != drawn:
+                with METRICS.timer("render", output="rich"):
+                    live.update(draw_board(station, changed, cells), refresh=True)
+                drawn = signature
+
+            states = current
+            for key in [key for key in cells if key[0] not in current]:
+                del cells[key]
+
+            time.sleep(interval)
+            try:
+                station = Huxley(
+                    crs=station.crs,
+                    rows=station.rows,
+                    endpoint=station.endpoint,
+                    filter_crs=station.filter_crs,
+                )
+            except HuxleyError:
+                # Keep showing the last board we had, marked as out of date.
+                station.stale = True
+
+
+def service_state(train: Service) -> tuple:
+    """Return the details of a service that are shown on the board."""
+    return (
+        train.std,
+        train.destination,
+        train.via,
+        train.platform,
+        train.etd,
+        train.is_cancelled,
+        train.delay_reason,
+        train.cancel_reason,
+    )
+
+
+def draw_board(
+    station: Huxley, changed: frozenset = frozenset(), cells: Optional[dict] = None
+) -> Group:
+    """Return the departure board, highlighting cancelled and changed services.
+
+    Destination cells are looked up in, and added to, `cells` when given.
+    """
     board = Table(
         box=None,
         style="white on black",
@@ -29,43 +161,59 @@ def get_departures(crs: str) -> None:
     board.add_column("Plat", justify="right", style="on black", no_wrap=True, width=6)
     board.add_column("Expected", justify="right", style="on black", width=12)
 
-    if station.train_services:
-        for train in station.train_services:
-
-            destination = Table(box=None, show_header=False, pad_edge=False)
-            destination.add_row(train.destination)
-
-            if train.via is not None:
-                via: str = f"[white]{train.via}[/white]"
-                destination.add_row(via)
-
-            if train.delay_reason and not train.cancel_reason:
-                delay: str = f"[white]{train.delay_reason}[/white]"
-                destination.add_row(delay)
-
-            if train.platform is None:
-                train.platform = "-"
-
-            if train.is_cancelled and train.cancel_reason:
-                cancellation: str = f"[white]{train.cancel_reason}[/]"
-                destination.add_row(cancellation)
-
-            board.add_row(train.std, destination, train.platform, train.etd)
-
-    console.print(board)
-
-    if board.row_count == 0:
-        if station.nrcc_messages:
-            for message in station.nrcc_messages:
-                output = Padding(message, (1, 10, 1, 10))
-                console.print(
-                    output, style="gold3 on black", justify="center", width=80
-                )
+    for train in station.train_services:
+        key: tuple = (train.guid, service_state(train))
+        if cells is not None and key in cells:
+            destination: Table = cells[key]
         else:
-            no_services: str = "\nPlease check timetable for services\n"
-            console.print(
-                no_services, style="gold3 on black", justify="center", width=80
-            )
+            destination = draw_destination(train)
+            if cells is not None:
+                cells[key] = destination
+
+        style: str = ""
+        if train.is_cancelled:
+            style = "bold white on dark_red"
+        elif train.guid in changed:
+            style = "bold black on gold3"
+
+        platform: str = "-" if train.platform is None else train.platform
+        board.add_row(train.std, destination, platform, train.etd, style=style)
+
+    renderables: list = [board]
+    if board.row_count == 0 and station.nrcc_messages:
+        for message in station.nrcc_messages:
+            output = Text(message, justify="center")
+            renderables.append(Padding(output, (1, 10, 1, 10), style="gold3 on black"))
+    elif board.row_count == 0:
+        no_services: str = "\nPlease check timetable for services\n"
+        renderables.append(Text(no_services, style="gold3 on black", justify="center"))
+
+    if station.stale:
+        updated: str = station.generated_at[11:16]
+        renderables.append(
+            Text(f"Live updates unavailable; as of {updated}", style="gold3")
+        )
+    return Group(*renderables)
+
+
+def draw_destination(train: Service) -> Table:
+    """Return the destination, via and any delay or cancellation as one cell."""
+    destination = Table(box=None, show_header=False, pad_edge=False)
+    destination.add_row(train.destination)
+
+    if train.via is not None:
+        via: str = f"[white]{train.via}[/white]"
+        destination.add_row(via)
+
+    if train.delay_reason and not train.cancel_reason:
+        delay: str = f"[white]{train.delay_reason}[/white]"
+        destination.add_row(delay)
+
+    if train.is_cancelled and train.cancel_reason:
+        cancellation: str = f"[white]{train.cancel_reason}[/]"
+        destination.add_row(cancellation)
+
+    return destination
 
 
 if __name__ == "__main__":
@@ -3,15 +3,40 @@
 """Show rail departures using the Huxley library."""
 import click
 
-from nationalrail import Huxley
+from nationalrail import (
+    METRICS,
+    Huxley,
+    HuxleyError,
+    complete_crs,
+    validate_crs,
+    validate_filter_crs,
+)
 from tabulate import tabulate
 
 
 @click.command()
-@click.option("--crs", default="wok", help="CRS code for station.")
-def get_departures(crs: str) -> None:
+@click.option(
+    "--crs",
+    default="wok",
+    help="CRS code for station.",
+    callback=validate_crs,
+    shell_complete=complete_crs,
+)
+@click.option(
+    "--to",
+    default="",
+    help="Only show services calling at this CRS.",
+    callback=validate_filter_crs,
+    shell_complete=complete_crs,
+)
+@click.option("--timings", is_flag=True, help="Print a timing summary to stderr.")
+def get_departures(crs: str, to: str, timings: bool) -> None:
     """Display plain-text table of upcoming departures from a named station."""
-    station = Huxley(crs=crs, rows=10, endpoint="departures")
+    METRICS.enabled = METRICS.enabled or timings
+    try:
+        station = Huxley(crs=crs, rows=10, endpoint="departures", filter_crs=to)
+    except HuxleyError as error:
+        raise click.ClickException(str(error)) from error
 
     board: list = []
     headers: list = ["Time", "Destination", "Plat", "Expected"]
@@ -32,7 +57,15 @@ def get_departures(crs: str) -> None:
         for bus in station.bus_services:
             board.append([bus.std, route(bus.destination, bus.via), "BUS", bus.etd])
 
-    print(tabulate(board, headers=headers, colalign=colalign))
+    with METRICS.timer("render", output="tabulate"):
+        print(tabulate(board, headers=headers, colalign=colalign))
+
+    if station.stale:
+        updated: str = station.generated_at[11:16]
+        print(f"Live updates unavailable; as of {updated}")
+
+    if timings:
+        click.echo(METRICS.summary(), err=True)
 
 
 def route(destination: str, via: str) -> str:
@@ -11,6 +11,9 @@ import requests
 from inky.auto import auto  # type: ignore
 from PIL import Image, ImageDraw, ImageFont
 
+from nationalrail import METRICS, complete_crs, validate_crs
+from nationalrail.metrics import timed
+
 API = "https://huxley2.azurewebsites.net"
 DOTMATRIX = ImageFont.truetype("./fonts/Dot Matrix Regular.ttf", 10)
 DOTMATRIX_LG = ImageFont.truetype("./fonts/Dot Matrix Regular.ttf", 18)
@@ -24,7 +27,8 @@ def get_train_services(
     train_services: dict = {}
     url: str = urljoin(API, f"/{endpoint}/{crs}/{rows}?expand={expand}")
     try:
-        response: requests.models.Response = requests.get(url)
+        with METRICS.timer("fetch_total", endpoint=endpoint):
+            response: requests.models.Response = requests.get(url)
         train_services = response.json()
     except ValueError as error:
         print(f'Error: No listed train services for CRS code "{crs}". ')
@@ -34,8 +38,13 @@ def get_train_services(
 
 def get_service_board(crs: str) -> dict:
     """Retrieve details of a specific service."""
-    service: dict = {}
     services: dict = get_train_services(crs, endpoint="departures", rows=1, expand=True)
+    return parse_service_board(services)
+
+
+def parse_service_board(services: dict) -> dict:
+    """Return the first service on a board in the shape the renderer expects."""
+    service: dict = {}
     generated_at: dt.datetime = dateutil.parser.isoparse(services["generatedAt"])
 
     if services["trainServices"]:
@@ -65,6 +74,7 @@ def get_service_board(crs: str) -> dict:
     return service
 
 
+@timed("render", output="inky", board="platform")
 def draw_platform_board(services: dict) -> None:
     """Render train information to PNG using Pillow library."""
 
@@ -93,9 +103,10 @@ def draw_platform_board(services: dict) -> None:
 
         draw.text((107, 105), timestamp, "white", font_xl)
 
-    img.save("./signage.png")
+    save_signage(img)
 
 
+@timed("render", output="inky", board="station")
 def draw_station_board(services: dict) -> None:
     """Render station information to PNG using Pillow library."""
     title = ImageFont.truetype("./fonts/Inter-Bold.otf", 26)
@@ -198,9 +209,10 @@ def draw_station_board(services: dict) -> None:
         # Page
         draw.text((left, 402), "Page 1 of 1", yellow, font_b, "lt")
 
-        img.save("./signage.png")
+        save_signage(img)
 
 
+@timed("layout")
 def get_multiline_text(text: str, font: ImageFont, max_width: int) -> list:
     """Split text into lines of a maximum width."""
     img = Image.new("RGB", (122, 250))
@@ -222,6 +234,7 @@ def get_multiline_text(text: str, font: ImageFont, max_width: int) -> list:
     return lines
 
 
+@timed("render", output="inky", board="service")
 def draw_service_board(service: dict) -> None:
     """Render train information to PNG using Pillow library."""
 
@@ -282,26 +295,42 @@ def draw_service_board(service: dict) -> None:
         draw.text((0, 240), service["operator"], "yellow", DOTMATRIX_BOLD)
 
     # Finally, save the image to disk
-    img.save("./signage.png")
+    save_signage(img)
+
+
+def save_signage(img: Image.Image) -> None:
+    """Save a rendered board to disk for the display to pick up."""
+    with METRICS.timer("png_encode"):
+        img.save("./signage.png")
 
 
 @click.command()
-@click.option("--crs", default="wok", help="CRS code for station.")
+@click.option(
+    "--crs",
+    default="wok",
+    help="CRS code for station.",
+    callback=validate_crs,
+    shell_complete=complete_crs,
+)
 @click.option("--style", default="service", help="CRS code for station.")
-def get_departures(crs: str, style: str) -> None:
+@click.option("--timings", is_flag=True, help="Print a timing summary to stderr.")
+def get_departures(crs: str, style: str, timings: bool) -> None:
     """Display plain-text table of upcoming departures from a named station."""
+    METRICS.enabled = METRICS.enabled or timings
     if style == "service":
         services = get_service_board(crs)
         draw_service_board(services)
     elif style == "station":
-        services = get_train_services(
-            crs=crs, endpoint="departures", rows=9, expand=True
-        )
+        # The station board never draws calling points, so skip expanding.
+        services = get_train_services(crs=crs, endpoint="departures", rows=9)
         draw_station_board(services)
     elif style == "platform":
         services = get_train_services(crs=crs, endpoint="departures", rows=6)
         draw_platform_board(services)
 
+    if timings:
+        click.echo(METRICS.summary(), err=True)
+
     try:
         display = auto()
     except RuntimeError:
@@ -1,2 +1,17 @@
-from .nationalrail import Huxley
+from .nationalrail import (
+    Huxley,
+    HuxleyError,
+    HuxleyNotFound,
+    ServiceCache,
+    service_from_details,
+)
+from .metrics import METRICS
+from .planner import View, plan, fetch
+from .stations import (
+    STATIONS,
+    canonical_filter_crs,
+    complete_crs,
+    validate_crs,
+    validate_filter_crs,
+)
 from .touchscreen import Color, Font, Display
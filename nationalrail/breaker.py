@@ -0,0 +1,57 @@
+"""A circuit breaker to fail fast while the upstream API is unhealthy."""
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Open after repeated failures, then let one probe through periodically.
+
+    While closed every call is allowed. After `threshold` consecutive
+    failures the breaker opens and refuses calls for `reset_after` seconds;
+    the first call after that is let through as a probe, which either closes
+    the breaker again or re-opens it for another period.
+    """
+
+    CLOSED: str = "closed"
+    OPEN: str = "open"
+    HALF_OPEN: str = "half-open"
+
+    def __init__(self, threshold: int = 5, reset_after: float = 30.0) -> None:
+        """Initialise the CircuitBreaker class."""
+        self.threshold: int = threshold
+        self.reset_after: float = reset_after
+        self.state: str = self.CLOSED
+        self.failures: int = 0
+        self.opened_at: float = 0.0
+        self._lock = threading.Lock()
+        return None
+
+    @property
+    def closed(self) -> bool:
+        """Return True if calls are flowing normally."""
+        return self.state == self.CLOSED
+
+    def allow(self) -> bool:
+        """Return True if a call to the upstream API may be attempted."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at >= self.reset_after:
+                    self.state = self.HALF_OPEN
+                    return True
+            return False
+
+    def success(self) -> None:
+        """Record a successful call and close the breaker."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def failure(self) -> None:
+        """Record a failed call, opening the breaker if needed."""
+        with self._lock:
+            self.failures = self.failures + 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
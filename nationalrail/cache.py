@@ -0,0 +1,210 @@
+"""Board snapshots cached in memory or shared between processes via SQLite."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from decouple import config  # type: ignore
+
+# Boards fresher than this are served without asking the API again.
+TTL: float = 20.0
+
+# Snapshots older than this are useless even as a stale fallback.
+RETENTION: float = 24 * 60 * 60
+
+
+@dataclass
+class Snapshot:
+    """A decoded board, when it was fetched and when to stop keeping it."""
+
+    fetched_at: float
+    services: dict
+    expires_at: float
+
+    @property
+    def age(self) -> float:
+        """Return the age of the snapshot in seconds."""
+        return time.time() - self.fetched_at
+
+
+class MemoryCache:
+    """A board cache private to the current process."""
+
+    def __init__(self, ttl: float = TTL) -> None:
+        """Initialise the MemoryCache class."""
+        self.ttl: float = ttl
+        self._snapshots: dict = {}
+        self._leases: dict = {}
+        self._lock = threading.Lock()
+        return None
+
+    def get(self, key: str) -> Optional[Snapshot]:
+        """Return the latest snapshot for `key`, if any."""
+        snapshot: Optional[Snapshot] = self._snapshots.get(key)
+        if snapshot is None or snapshot.expires_at <= time.time():
+            return None
+        return snapshot
+
+    def claim(self, key: str, lease: float) -> bool:
+        """Return True if the caller should refresh `key` for everyone."""
+        with self._lock:
+            now: float = time.time()
+            if self._leases.get(key, 0.0) > now:
+                return False
+            self._leases[key] = now + lease
+            return True
+
+    def release(self, key: str) -> None:
+        """Give up a claim on `key` after failing to refresh it."""
+        with self._lock:
+            self._leases.pop(key, None)
+
+    def put(self, key: str, services: dict, retention: float = RETENTION) -> None:
+        """Publish a new snapshot for `key`, kept for `retention` seconds."""
+        now: float = time.time()
+        with self._lock:
+            for old in [k for k, s in self._snapshots.items() if s.expires_at <= now]:
+                del self._snapshots[old]
+            self._snapshots[key] = Snapshot(
+                fetched_at=now, services=services, expires_at=now + retention
+            )
+            self._leases.pop(key, None)
+
+
+class SQLiteCache:
+    """A board cache shared by every process on the host.
+
+    Each board is stored once as JSON and replaced atomically in a single
+    transaction. Readers check the publish time first and only decode the
+    payload when it has changed since they last looked; decoded copies are
+    kept only while fresh, so a stale fallback is decoded again on demand
+    and memory does not grow with the number of workers. A short lease lets
+    one process refresh an expired board while the others keep serving the
+    previous snapshot, so upstream traffic does not grow with the number of
+    workers. A lease on a board with no snapshot yet is held in a row with
+    no payload, which readers treat as missing.
+    """
+
+    SCHEMA: str = (
+        "CREATE TABLE IF NOT EXISTS boards ("
+        "key TEXT PRIMARY KEY, fetched_at REAL, leased_until REAL, payload TEXT, "
+        "expires_at REAL)"
+    )
+
+    def __init__(self, path: str, ttl: float = TTL) -> None:
+        """Initialise the SQLiteCache class."""
+        self.path: str = path
+        self.ttl: float = ttl
+        self._decoded: dict = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        with self.connection as connection:
+            connection.execute(self.SCHEMA)
+            columns: list = [
+                row[1] for row in connection.execute("PRAGMA table_info(boards)")
+            ]
+            # Files written before snapshots had their own expiry.
+            if "expires_at" not in columns:
+                connection.execute("ALTER TABLE boards ADD COLUMN expires_at REAL")
+                connection.execute(
+                    "UPDATE boards SET expires_at = fetched_at + ?", (RETENTION,)
+                )
+        return None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Return a connection owned by the current thread and process."""
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def get(self, key: str) -> Optional[Snapshot]:
+        """Return the latest snapshot for `key`, if any."""
+        row = self.connection.execute(
+            "SELECT fetched_at, expires_at FROM boards WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[0] is None or row[1] <= time.time():
+            return None
+
+        with self._lock:
+            snapshot: Optional[Snapshot] = self._decoded.get(key)
+        if snapshot is not None and snapshot.fetched_at == row[0]:
+            return snapshot
+
+        row = self.connection.execute(
+            "SELECT fetched_at, payload, expires_at FROM boards WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        snapshot = Snapshot(
+            fetched_at=row[0], services=json.loads(row[1]), expires_at=row[2]
+        )
+        self.remember(key, snapshot)
+        return snapshot
+
+    def claim(self, key: str, lease: float) -> bool:
+        """Return True if the caller should refresh `key` for everyone."""
+        now: float = time.time()
+        with self.connection as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO boards (key, leased_until) VALUES (?, 0)",
+                (key,),
+            )
+            cursor = connection.execute(
+                "UPDATE boards SET leased_until = ? "
+                "WHERE key = ? AND leased_until <= ?",
+                (now + lease, key, now),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, key: str) -> None:
+        """Give up a claim on `key` after failing to refresh it."""
+        with self.connection as connection:
+            connection.execute(
+                "DELETE FROM boards WHERE key = ? AND payload IS NULL", (key,)
+            )
+            connection.execute(
+                "UPDATE boards SET leased_until = 0 WHERE key = ?", (key,)
+            )
+
+    def put(self, key: str, services: dict, retention: float = RETENTION) -> None:
+        """Publish a new snapshot for `key`, kept for `retention` seconds."""
+        now: float = time.time()
+        payload: str = json.dumps(services, separators=(",", ":"))
+        with self.connection as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO boards "
+                "(key, fetched_at, leased_until, payload, expires_at) "
+                "VALUES (?, ?, 0, ?, ?)",
+                (key, now, payload, now + retention),
+            )
+            connection.execute("DELETE FROM boards WHERE expires_at <= ?", (now,))
+        snapshot = Snapshot(
+            fetched_at=now, services=services, expires_at=now + retention
+        )
+        self.remember(key, snapshot)
+
+    def remember(self, key: str, snapshot: Snapshot) -> None:
+        """Keep a decoded snapshot while it is fresh, forgetting stale ones."""
+        with self._lock:
+            for old in [k for k, s in self._decoded.items() if s.age >= self.ttl]:
+                del self._decoded[old]
+            if snapshot.age < self.ttl:
+                self._decoded[key] = snapshot
+
+
+def open_cache():
+    """Return the shared cache named by BOARD_CACHE, else a private one."""
+    path: str = config("BOARD_CACHE", default="")
+    ttl: float = config("BOARD_CACHE_TTL", default=TTL, cast=float)
+    if path:
+        return SQLiteCache(path, ttl=ttl)
+    return MemoryCache(ttl=ttl)
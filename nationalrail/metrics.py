@@ -0,0 +1,157 @@
+"""Timings and counters for the fetch, parse and render hot paths."""
+import contextlib
+import functools
+import os
+import threading
+import time
+from typing import Callable
+
+from decouple import config  # type: ignore
+
+PREFIX: str = "nationalrail"
+
+# Returned by `timer` when disabled, so an untimed block costs one attribute check.
+DISABLED = contextlib.nullcontext()
+
+
+class Timer:
+    """A context manager that records how long its block took."""
+
+    __slots__ = ("registry", "key", "started")
+
+    def __init__(self, registry: "Registry", key: tuple) -> None:
+        """Initialise the Timer class."""
+        self.registry = registry
+        self.key: tuple = key
+        self.started: float = 0.0
+
+    def __enter__(self) -> "Timer":
+        """Start timing."""
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Stop timing and record the duration."""
+        self.registry.record(self.key, time.perf_counter() - self.started)
+
+
+class Registry:
+    """Stage timings and event counters, exported in Prometheus text format.
+
+    Timings are keyed by stage (e.g. "fetch_total", "png_encode") and
+    counters by name, each with optional labels. Nothing is recorded unless
+    `enabled` is set, from the METRICS environment variable by default.
+
+    Each process keeps its own registry. Under several WSGI workers a scrape
+    sees only the worker that answered, so exported series carry a `pid`
+    label; sum them without it to total across workers.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """Initialise the Registry class."""
+        self.enabled: bool = enabled
+        self._timings: dict = {}
+        self._counters: dict = {}
+        self._lock = threading.Lock()
+        return None
+
+    def timer(self, stage: str, **labels: str):
+        """Return a context manager timing `stage`."""
+        if not self.enabled:
+            return DISABLED
+        return Timer(self, (stage, tuple(sorted(labels.items()))))
+
+    def observe(self, stage: str, seconds: float, **labels: str) -> None:
+        """Record a duration measured elsewhere."""
+        if self.enabled:
+            self.record((stage, tuple(sorted(labels.items()))), seconds)
+
+    def record(self, key: tuple, seconds: float) -> None:
+        """Add a duration to the count, sum and maximum for `key`."""
+        with self._lock:
+            count, total, maximum = self._timings.get(key, (0, 0.0, 0.0))
+            self._timings[key] = (count + 1, total + seconds, max(maximum, seconds))
+
+    def increment(self, name: str, amount: int = 1, **labels: str) -> None:
+        """Add `amount` to a counter."""
+        if not self.enabled:
+            return
+        key: tuple = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+
+    def prometheus(self) -> str:
+        """Return every timing and counter in Prometheus text format."""
+        with self._lock:
+            timings: list = sorted(self._timings.items())
+            counters: list = sorted(self._counters.items())
+
+        pid: tuple = (("pid", str(os.getpid())),)
+        name: str = f"{PREFIX}_stage_seconds"
+        lines: list = [f"# TYPE {name} summary"]
+        for (stage, labels), (count, total, _) in timings:
+            selector: str = format_labels((("stage", stage),) + labels + pid)
+            lines.append(f"{name}_count{selector} {count}")
+            lines.append(f"{name}_sum{selector} {total:.6f}")
+
+        lines.append(f"# TYPE {name}_max gauge")
+        for (stage, labels), (_, _, maximum) in timings:
+            selector = format_labels((("stage", stage),) + labels + pid)
+            lines.append(f"{name}_max{selector} {maximum:.6f}")
+
+        declared: set = set()
+        for (counter, labels), value in counters:
+            if counter not in declared:
+                lines.append(f"# TYPE {PREFIX}_{counter} counter")
+                declared.add(counter)
+            lines.append(f"{PREFIX}_{counter}{format_labels(labels + pid)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Return a short table of timings and counters for the terminal."""
+        with self._lock:
+            timings: list = sorted(self._timings.items())
+            counters: list = sorted(self._counters.items())
+
+        lines: list = [f"{'Stage':<52}{'Calls':>7}{'Total ms':>11}{'Max ms':>10}"]
+        for (stage, labels), (count, total, maximum) in timings:
+            label: str = stage + format_labels(labels)
+            lines.append(
+                f"{label:<52}{count:>7}{total * 1000:>11.2f}{maximum * 1000:>10.2f}"
+            )
+        for (counter, labels), value in counters:
+            lines.append(f"{counter + format_labels(labels):<52}{value:>7}")
+        return "\n".join(lines)
+
+
+def format_labels(labels: tuple) -> str:
+    """Return labels as a Prometheus selector, e.g. {stage="parse"}."""
+    if not labels:
+        return ""
+    pairs: str = ",".join(f'{key}="{value}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+
+METRICS = Registry(enabled=config("METRICS", default=False, cast=bool))
+
+
+def timed(stage: str, **labels: str) -> Callable:
+    """Decorate a function so each call is timed as `stage`."""
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            with METRICS.timer(stage, **labels):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,7 +1,15 @@
 """Retrieve and parse data from the National Rail API."""
 import datetime
+import json
 import logging
+import re
+import socket
+import threading
+import time
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from typing import Iterable, Optional
 from urllib.parse import urljoin
 
 import bleach
@@ -9,12 +17,55 @@ import dateutil.parser
 import requests
 from decouple import config, UndefinedValueError  # type: ignore
 
+from .breaker import CircuitBreaker
+from .cache import Snapshot, open_cache
+from .metrics import METRICS, timed
+from .stations import STATIONS, canonical_filter_crs
+
 
 @dataclass
 class Server:
     """A server to connect to."""
 
-    BASE: str = "https://huxley2.azurewebsites.net"
+    BASE: str = config("HUXLEY_URL", default="https://huxley2.azurewebsites.net")
+    DEADLINE: float = 5.0
+
+
+# Boards return up to `rows` services and accept an optional to/from filter.
+BOARD_ENDPOINTS: tuple = ("departures", "arrivals", "all")
+
+# Single-service lookups return one service per filter CRS and need a filter.
+NEXT_ENDPOINTS: tuple = ("next", "fastest")
+
+FILTER_TYPES: tuple = ("to", "from")
+
+# Keep details of services with no later calls briefly, to absorb repeat clicks.
+SERVICE_MIN_TTL = datetime.timedelta(minutes=1)
+
+# One pooled session and breaker are shared by every request to the API.
+SESSION = requests.Session()
+BREAKER = CircuitBreaker()
+
+# Service lookups, many of them background prefetches, have their own breaker
+# so their failures cannot stop boards being fetched.
+SERVICE_BREAKER = CircuitBreaker()
+
+# Requests run on these threads so the caller can give up at the deadline.
+DOWNLOADS = ThreadPoolExecutor(max_workers=32, thread_name_prefix="download")
+
+# Recent boards, served while fresh and as a fallback if the API is unavailable.
+CACHE = open_cache()
+
+# How often to check for a board another process is fetching for the first time.
+POLL_INTERVAL: float = 0.05
+
+
+class HuxleyError(Exception):
+    """The Huxley API could not be reached or returned an unusable response."""
+
+
+class HuxleyNotFound(HuxleyError):
+    """The Huxley API has no board or service at the requested path."""
 
 
 @dataclass
@@ -52,14 +103,30 @@ class Huxley:
     """A class to retrieve and parse data from the Huxley API."""
 
     def __init__(
-        self, crs: str, rows: int, expand: bool = False, endpoint: str = "departures"
+        self,
+        crs: str,
+        rows: int,
+        expand: bool = False,
+        endpoint: str = "departures",
+        filter_crs: str = "",
+        filter_type: str = "to",
+        services: Optional[dict] = None,
     ) -> None:
-        """Initialise the Huxley class."""
+        """Initialise the Huxley class.
+
+        A `filter_crs` restricts the board server-side to services calling at
+        (`filter_type="to"`) or coming from (`filter_type="from"`) one or more
+        comma-separated stations. Pass `services` to wrap an already-fetched
+        response instead of requesting a new one.
+        """
         self.crs: str = crs
         self.rows: int = rows
         self.expand: bool = expand
         self.endpoint: str = endpoint
-        self.services = self.get_services()
+        self.filter_crs: str = filter_crs
+        self.filter_type: str = filter_type
+        self.stale: bool = False
+        self.services = services if services is not None else self.get_services()
         return None
 
     @property
@@ -69,35 +136,125 @@ class Huxley:
 
     @crs.setter
     def crs(self, value: str):
-        if len(value) < 3:
-            raise ValueError("CRS code must be at least 3 characters long.")
+        crs: Optional[str] = STATIONS.canonical(value)
+        if crs is None:
+            raise ValueError(STATIONS.unknown(value))
+        else:
+            self._crs = crs
+
+    @property
+    def filter_crs(self):
+        """Return the comma-separated CRS codes to filter by."""
+        return self._filter_crs
+
+    @filter_crs.setter
+    def filter_crs(self, value: str):
+        self._filter_crs = canonical_filter_crs(value)
+
+    @property
+    def endpoint(self):
+        """Return the endpoint name."""
+        return self._endpoint
+
+    @endpoint.setter
+    def endpoint(self, value: str):
+        if value not in BOARD_ENDPOINTS + NEXT_ENDPOINTS:
+            raise ValueError(f'Unknown endpoint "{value}".')
+        else:
+            self._endpoint = value
+
+    @property
+    def filter_type(self):
+        """Return the filter type."""
+        return self._filter_type
+
+    @filter_type.setter
+    def filter_type(self, value: str):
+        if value not in FILTER_TYPES:
+            raise ValueError('Filter type must be "to" or "from".')
         else:
-            self._crs = value
+            self._filter_type = value
+
+    @property
+    def path(self) -> str:
+        """Return the API path for the configured endpoint and filter."""
+        if self.endpoint in NEXT_ENDPOINTS:
+            if not self.filter_crs:
+                raise ValueError(f'The "{self.endpoint}" endpoint needs a filter CRS.')
+            return f"/{self.endpoint}/{self.crs}/{self.filter_type}/{self.filter_crs}"
+        if self.filter_crs:
+            return (
+                f"/{self.endpoint}/{self.crs}/{self.filter_type}/{self.filter_crs}"
+                f"/{self.rows}"
+            )
+        return f"/{self.endpoint}/{self.crs}/{self.rows}"
 
     def get_services(self) -> dict:
-        """Return a dictionary of services."""
+        """Return a dictionary of services.
+
+        Boards are served from the cache while fresh. If the API is
+        unavailable, the last good response for this board is returned
+        instead and `stale` is set.
+        """
         services: dict = {}
-        url: str = urljoin(Server.BASE, f"/{self.endpoint}/{self.crs}/{self.rows}")
         params = {"expand": str(self.expand)}
+        key: str = f"{self.path}?expand={self.expand}"
 
-        # Append access token to the query if found in environment variables.
-        try:
-            access_token: str = config("ACCESS_TOKEN")
-            params.update({"accessToken": access_token})
-        except UndefinedValueError as error:
-            logging.warning(error)
-            raise SystemExit from error
+        snapshot: Optional[Snapshot] = CACHE.get(key)
+        if snapshot is not None and snapshot.age < CACHE.ttl:
+            METRICS.increment("cache_requests_total", cache="board", result="hit")
+            return snapshot.services
+
+        # Another process is already refreshing this board; serve its last copy.
+        if not CACHE.claim(key, Server.DEADLINE):
+            if snapshot is not None:
+                METRICS.increment(
+                    "cache_requests_total", cache="board", result="leased"
+                )
+                return snapshot.services
+            snapshot = await_snapshot(key)
+            if snapshot is not None:
+                METRICS.increment(
+                    "cache_requests_total", cache="board", result="waited"
+                )
+                return snapshot.services
+
+        METRICS.increment("cache_requests_total", cache="board", result="miss")
 
         # Attempt to to retrieve the data from the API.
         try:
-            response: requests.models.Response = requests.get(url, params)
-            services = response.json()
-        except ValueError as error:
-            logging.warning(f'CRS code "{self.crs}" not found. ')
-            raise SystemExit from error
+            services = normalise(get_json(self.path, params))
+        except HuxleyError as error:
+            CACHE.release(key)
+            if snapshot is None:
+                logging.warning(f'No services found for CRS code "{self.crs}". ')
+                raise
+            logging.warning(f"Serving stale board for {key}: {error}")
+            METRICS.increment("cache_requests_total", cache="board", result="stale")
+            self.stale = True
+            return snapshot.services
 
+        CACHE.put(key, services)
         return services
 
+    def limit(self, rows: int) -> "Huxley":
+        """Return a copy of this board trimmed to the first `rows` services."""
+        services: dict = dict(self.services)
+        for key in ("trainServices", "busServices"):
+            if services.get(key) is not None:
+                services[key] = services[key][:rows]
+        board = Huxley(
+            crs=self.crs,
+            rows=rows,
+            expand=self.expand,
+            endpoint=self.endpoint,
+            filter_crs=self.filter_crs,
+            filter_type=self.filter_type,
+            services=services,
+        )
+        board.stale = self.stale
+        return board
+
     @property
     def generated_at(self) -> str:
         """Return the date and time the data was generated."""
@@ -109,10 +266,11 @@ class Huxley:
         return self.services["locationName"]
 
     @property
+    @timed("parse", kind="train_services")
     def train_services(self) -> list:
         """Return a list of train services."""
         train_services: list = []
-        if self.services["trainServices"] is not None:
+        if self.services.get("trainServices") is not None:
             for train_service in self.services["trainServices"]:
                 service = Service()
                 service.etd = train_service["etd"]
@@ -140,10 +298,11 @@ class Huxley:
         return train_services
 
     @property
+    @timed("parse", kind="bus_services")
     def bus_services(self) -> list:
         """Return a list of bus services."""
         bus_services: list = []
-        if self.services["busServices"] is not None:
+        if self.services.get("busServices") is not None:
             for bus_service in self.services["busServices"]:
                 service = Service()
                 service.etd = bus_service["etd"]
@@ -159,11 +318,314 @@ class Huxley:
         return bus_services
 
     @property
+    @timed("parse", kind="nrcc_messages")
     def nrcc_messages(self) -> list:
         """Return a list of NRCC messages."""
         nrcc_messages: list = []
-        if self.services["nrccMessages"] is not None:
+        if self.services.get("nrccMessages") is not None:
             for service in self.services["nrccMessages"]:
                 text: str = bleach.clean(service["value"], tags=[], strip=True)
                 nrcc_messages.append(text)
         return nrcc_messages
+
+
+def await_snapshot(key: str) -> Optional[Snapshot]:
+    """Wait for the first snapshot of a board another process is fetching.
+
+    Returns None, leaving the caller to fetch the board itself, if the other
+    process gives up its claim or the deadline passes first.
+    """
+    expires: float = time.monotonic() + Server.DEADLINE
+    while time.monotonic() < expires:
+        time.sleep(POLL_INTERVAL)
+        snapshot: Optional[Snapshot] = CACHE.get(key)
+        if snapshot is not None:
+            return snapshot
+        if CACHE.claim(key, Server.DEADLINE):
+            return None
+    return None
+
+
+def normalise(services: dict) -> dict:
+    """Return `next`/`fastest` responses in the same shape as a board.
+
+    These endpoints wrap each service as `{"crs": ..., "service": {...}}` under
+    a `departures` key rather than listing them under `trainServices`.
+    """
+    if "trainServices" in services or "departures" not in services:
+        return services
+    board: dict = dict(services)
+    departures: list = board.pop("departures") or []
+    board["trainServices"] = [
+        departure["service"] for departure in departures if departure["service"]
+    ] or None
+    board["busServices"] = None
+    return board
+
+
+def get_json(
+    path: str, params: Optional[dict] = None, breaker: CircuitBreaker = BREAKER
+) -> dict:
+    """Return the decoded JSON response for an API path.
+
+    The whole request must complete within `Server.DEADLINE` seconds. Server
+    errors and timeouts count towards opening `breaker`, after which calls
+    fail immediately until a periodic probe succeeds.
+    """
+    url: str = urljoin(Server.BASE, path)
+    params = dict(params or {})
+
+    # Append access token to the query if found in environment variables.
+    try:
+        access_token: str = config("ACCESS_TOKEN")
+        params.update({"accessToken": access_token})
+    except UndefinedValueError as error:
+        raise HuxleyError(f"Not requesting {path}: {error}") from error
+
+    endpoint: str = path.split("/")[1]
+    METRICS.increment("upstream_requests_total", endpoint=endpoint)
+    if not breaker.allow():
+        METRICS.increment("upstream_errors_total", reason="circuit_open")
+        raise HuxleyError(f"Circuit open; not requesting {path}.")
+
+    try:
+        with METRICS.timer("fetch_total", endpoint=endpoint):
+            status, body = download(url, params, Server.DEADLINE, endpoint)
+    except (requests.RequestException, TimeoutError) as error:
+        METRICS.increment("upstream_errors_total", reason=type(error).__name__)
+        breaker.failure()
+        # The exception's text includes the full URL, access token and all.
+        reason: str = type(error).__name__
+        raise HuxleyError(f"Request for {path} failed: {reason}") from error
+
+    if status >= 500:
+        METRICS.increment("upstream_errors_total", reason=f"http_{status}")
+        breaker.failure()
+        raise HuxleyError(f"Request for {path} returned HTTP {status}.")
+
+    breaker.success()
+    if status >= 400:
+        METRICS.increment("upstream_errors_total", reason=f"http_{status}")
+        exception = HuxleyNotFound if status == 404 else HuxleyError
+        raise exception(f"Request for {path} returned HTTP {status}.")
+
+    try:
+        with METRICS.timer("json_decode", endpoint=endpoint):
+            return json.loads(body)
+    except ValueError as error:
+        METRICS.increment("upstream_errors_total", reason="invalid_json")
+        raise HuxleyError(f"Request for {path} returned invalid JSON.") from error
+
+
+def download(url: str, params: dict, deadline: float, endpoint: str) -> tuple:
+    """Return the status and body of a GET request bounded by a total deadline.
+
+    Socket timeouts only bound each read, so a server trickling its response
+    could hold a request open indefinitely. The request instead runs on a
+    worker thread; connecting, waiting for headers and reading the body must
+    all finish within `deadline`, after which the connection is shut down.
+    """
+    responses: list = []
+    future = DOWNLOADS.submit(receive, url, params, deadline, endpoint, responses)
+    try:
+        return future.result(timeout=deadline)
+    except futures.TimeoutError as error:
+        future.cancel()
+        for response in responses:
+            abort(response)
+        raise TimeoutError(f"Deadline of {deadline}s exceeded.") from error
+
+
+def receive(
+    url: str, params: dict, deadline: float, endpoint: str, responses: list
+) -> tuple:
+    """Return the status and body of a GET request, exposing the response."""
+    with SESSION.get(url, params=params, timeout=deadline, stream=True) as response:
+        responses.append(response)
+        # requests times from sending the request until the headers are parsed.
+        METRICS.observe(
+            "fetch_ttfb", response.elapsed.total_seconds(), endpoint=endpoint
+        )
+        return response.status_code, response.content
+
+
+def abort(response: requests.Response) -> None:
+    """Shut down a response's socket, unblocking any thread reading from it."""
+    connection = getattr(response.raw, "connection", None)
+    sock: Optional[socket.socket] = getattr(connection, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def get_service_details(guid: str) -> dict:
+    """Return the full details of a service, including all calling points."""
+    try:
+        details: dict = get_json(f"/service/{guid}", breaker=SERVICE_BREAKER)
+    except HuxleyNotFound:
+        logging.warning(f'Service "{guid}" not found.')
+        raise
+    except HuxleyError as error:
+        logging.warning(f'Service "{guid}" unavailable: {error}')
+        raise
+    return details
+
+
+def service_from_details(details: dict) -> Service:
+    """Return a Service populated from a service details response."""
+    service = Service()
+    service.etd = details["etd"]
+    service.std = details["std"]
+    service.is_cancelled = details["isCancelled"]
+    service.cancel_reason = details["cancelReason"]
+    service.delay_reason = details["delayReason"]
+    service.platform = details["platform"]
+    service.operator = details["operator"]
+    service.guid = details.get("serviceIdGuid") or ""
+
+    previous: list = calling_points(details, "previousCallingPoints")
+    subsequent: list = calling_points(details, "subsequentCallingPoints")
+    service.origin = details["locationName"]
+    if previous:
+        service.origin = previous[0]["locationName"]
+    if subsequent:
+        service.destination = subsequent[-1]["locationName"]
+        service.destination_crs = subsequent[-1]["crs"]
+        service.calling_points = details["subsequentCallingPoints"]
+    return service
+
+
+def calling_points(details: dict, key: str) -> list:
+    """Return the calling points of the first (main) route under `key`."""
+    routes: Optional[list] = details.get(key)
+    if not routes:
+        return []
+    return routes[0]["callingPoint"] or []
+
+
+def last_calling_time(details: dict) -> datetime.datetime:
+    """Return when the service makes its last call, per the latest estimate."""
+    generated_at: datetime.datetime = dateutil.parser.isoparse(details["generatedAt"])
+    points: list = calling_points(details, "subsequentCallingPoints")
+    if not points:
+        return generated_at + SERVICE_MIN_TTL
+
+    last: dict = points[-1]
+    clock: str = last["st"]
+    if re.fullmatch(r"\d{2}:\d{2}", last["et"] or ""):
+        clock = last["et"]
+    hour, minute = (int(part) for part in clock.split(":"))
+    called_at = generated_at.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+    # Times are wall-clock only; a call "earlier" than now is after midnight.
+    if called_at < generated_at - datetime.timedelta(hours=6):
+        called_at = called_at + datetime.timedelta(days=1)
+    return max(called_at, generated_at + SERVICE_MIN_TTL)
+
+
+class ServiceCache:
+    """A cache of service details, keyed by serviceIdGuid.
+
+    Details are kept in the board cache, so every process shares them when
+    BOARD_CACHE is set, and expire at the service's last calling time.
+    Services on hot boards, viewed at least `hot_views` times within
+    `hot_window` seconds, are prefetched in the background so drill-down
+    views are served from the cache.
+    """
+
+    def __init__(
+        self, workers: int = 4, hot_views: int = 3, hot_window: float = 60.0
+    ) -> None:
+        """Initialise the ServiceCache class."""
+        self.workers: int = workers
+        self.hot_views: int = hot_views
+        self.hot_window: float = hot_window
+        self._views: dict = {}
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        return None
+
+    def __contains__(self, guid: str) -> bool:
+        """Return True if fresh details for `guid` are cached."""
+        return self.lookup(guid) is not None
+
+    def lookup(self, guid: str) -> Optional[dict]:
+        """Return cached details for `guid` if they have not expired."""
+        snapshot: Optional[Snapshot] = CACHE.get(f"/service/{guid}")
+        return snapshot.services if snapshot is not None else None
+
+    def get(self, guid: str) -> dict:
+        """Return service details, from the cache where possible."""
+        details: Optional[dict] = self.lookup(guid)
+        if details is not None:
+            METRICS.increment("cache_requests_total", cache="service", result="hit")
+            return details
+        METRICS.increment("cache_requests_total", cache="service", result="miss")
+        details = get_service_details(guid)
+        self.put(guid, details)
+        return details
+
+    def put(self, guid: str, details: dict) -> None:
+        """Store service details until the service makes its last call."""
+        expires: datetime.timedelta = last_calling_time(details) - now()
+        CACHE.put(f"/service/{guid}", details, retention=expires.total_seconds())
+
+    def is_hot(self, board: str) -> bool:
+        """Record a view of `board` and return True if it is viewed often."""
+        current: float = time.monotonic()
+        with self._lock:
+            views: list = [
+                at
+                for at in self._views.get(board, [])
+                if current - at < self.hot_window
+            ]
+            views.append(current)
+            self._views[board] = views
+            return len(views) >= self.hot_views
+
+    def prefetch(self, board: str, guids: Iterable[str]) -> None:
+        """Fetch details of a hot board's uncached services in the background.
+
+        Nothing is prefetched while either circuit breaker is open, so
+        background lookups never add to an outage.
+        """
+        if not self.is_hot(board):
+            return
+        if not (BREAKER.closed and SERVICE_BREAKER.closed):
+            METRICS.increment("prefetch_skipped_total", reason="circuit_open")
+            return
+        for guid in guids:
+            if not guid or guid in self:
+                continue
+            with self._lock:
+                if guid in self._pending:
+                    continue
+                self._pending.add(guid)
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="prefetch"
+                    )
+            self._executor.submit(self._prefetch, guid)
+
+    def _prefetch(self, guid: str) -> None:
+        """Fetch and cache a single service, logging rather than raising."""
+        key: str = f"/service/{guid}"
+        try:
+            # Another process is already prefetching this service.
+            if not CACHE.claim(key, Server.DEADLINE):
+                return
+            self.get(guid)
+        except HuxleyError as error:
+            CACHE.release(key)
+            logging.warning(f'Could not prefetch service "{guid}": {error!r}')
+        finally:
+            with self._lock:
+                self._pending.discard(guid)
+
+
+def now() -> datetime.datetime:
+    """Return the current time in UTC."""
+    return datetime.datetime.now(datetime.timezone.utc)
@@ -0,0 +1,74 @@
+"""Plan the smallest set of Huxley fetches able to satisfy a set of views."""
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from .nationalrail import NEXT_ENDPOINTS, Huxley
+
+
+@dataclass(frozen=True)
+class View:
+    """The rows, detail and board a single rendered view needs."""
+
+    rows: int
+    expand: bool = False
+    endpoint: str = "departures"
+    filter_crs: str = ""
+    filter_type: str = "to"
+
+
+@dataclass
+class Fetch:
+    """A single upstream request that serves one or more views."""
+
+    endpoint: str
+    rows: int
+    expand: bool = False
+    filter_crs: str = ""
+    filter_type: str = "to"
+    views: list = field(default_factory=list)
+
+
+def plan(views: List[View]) -> List[Fetch]:
+    """Return the fetches needed to serve every view.
+
+    Views on the same endpoint and filter share one fetch, sized to the
+    largest row count requested and expanded if any of them needs calling
+    points; an expanded board is a superset of the plain one.
+    """
+    fetches: Dict[tuple, Fetch] = {}
+    for view in views:
+        key: tuple = (view.endpoint, view.filter_type, view.filter_crs.lower())
+        rows: int = 1 if view.endpoint in NEXT_ENDPOINTS else view.rows
+        if key not in fetches:
+            fetches[key] = Fetch(
+                endpoint=view.endpoint,
+                rows=rows,
+                expand=view.expand,
+                filter_crs=view.filter_crs,
+                filter_type=view.filter_type,
+            )
+        fetch: Fetch = fetches[key]
+        fetch.rows = max(fetch.rows, rows)
+        fetch.expand = fetch.expand or view.expand
+        fetch.views.append(view)
+    return list(fetches.values())
+
+
+def fetch(crs: str, views: List[View]) -> Dict[View, Huxley]:
+    """Fetch the boards for `crs` and return one `Huxley` per view."""
+    boards: Dict[View, Huxley] = {}
+    for planned in plan(views):
+        board = Huxley(
+            crs=crs,
+            rows=planned.rows,
+            expand=planned.expand,
+            endpoint=planned.endpoint,
+            filter_crs=planned.filter_crs,
+            filter_type=planned.filter_type,
+        )
+        for view in planned.views:
+            if view.endpoint in NEXT_ENDPOINTS:
+                boards[view] = board
+            else:
+                boards[view] = board.limit(view.rows)
+    return boards
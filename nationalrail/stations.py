@@ -0,0 +1,175 @@
+"""A local index of station CRS codes and names."""
+import bisect
+import csv
+import datetime
+import difflib
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import click
+from click.shell_completion import CompletionItem
+
+STATIONS_CSV: str = os.path.join(os.path.dirname(__file__), "stations.csv")
+
+
+class StationIndex:
+    """CRS codes and station names, read from disk on first use.
+
+    The index lists every National Rail station, so anything not in it is
+    rejected without asking the API.
+    """
+
+    def __init__(self, path: str = STATIONS_CSV) -> None:
+        """Initialise the StationIndex class."""
+        self.path: str = path
+        self._names: dict = {}
+        self._codes: dict = {}
+        self._keys: list = []
+        self._loaded: bool = False
+        self._lock = threading.Lock()
+        return None
+
+    def load(self) -> None:
+        """Read the index from disk, once."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with open(self.path, newline="", encoding="utf-8") as file:
+                file.readline()  # Skip the comment recording the index's source.
+                rows: list = [row for row in csv.reader(file) if row]
+            self._names = {crs.upper(): name for crs, name in rows}
+            self._codes = {name.lower(): crs.upper() for crs, name in rows}
+            self._keys = sorted(self._codes)
+            self._loaded = True
+
+    def __contains__(self, crs: str) -> bool:
+        """Return True if `crs` is a known CRS code."""
+        self.load()
+        return crs.upper() in self._names
+
+    def name(self, crs: str) -> Optional[str]:
+        """Return the name of the station with this CRS code."""
+        self.load()
+        return self._names.get(crs.upper())
+
+    def canonical(self, value: str) -> Optional[str]:
+        """Return the upper-case CRS code of a station given by CRS or name."""
+        self.load()
+        if value.upper() in self._names:
+            return value.upper()
+        return self._codes.get(value.lower())
+
+    def is_valid(self, value: str) -> bool:
+        """Return True if `value` may identify a station (by CRS or name)."""
+        return self.canonical(value) is not None
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """Return up to `limit` (CRS, name) pairs matching `query`.
+
+        An exact CRS code comes first, then names starting with the query,
+        then CRS codes and words within names starting with it, and finally
+        near misses to catch typos.
+        """
+        self.load()
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        matches: list = []
+        if query.upper() in self._names:
+            matches.append(query.upper())
+
+        start: int = bisect.bisect_left(self._keys, query)
+        for key in self._keys[start:]:
+            if not key.startswith(query):
+                break
+            matches.append(self._codes[key])
+
+        for key, crs in self._codes.items():
+            words: list = key.replace("(", " ").split()
+            if crs.lower().startswith(query) or any(
+                word.startswith(query) for word in words
+            ):
+                matches.append(crs)
+
+        for key in difflib.get_close_matches(query, self._keys, n=limit):
+            matches.append(self._codes[key])
+
+        unique: list = list(dict.fromkeys(matches))[:limit]
+        return [(crs, self._names[crs]) for crs in unique]
+
+    def unknown(self, value: str) -> str:
+        """Return an error message for an unknown station, with suggestions."""
+        message: str = f'Unknown station "{value}".'
+        suggestions: list = self.search(value, limit=3)
+        if suggestions:
+            names: str = ", ".join(f"{crs} ({name})" for crs, name in suggestions)
+            message = f"{message} Did you mean {names}?"
+        return message
+
+
+STATIONS = StationIndex()
+
+
+def canonical_filter_crs(value: str) -> str:
+    """Return a comma-separated list of stations as canonical CRS codes.
+
+    Raises ValueError naming the first unknown station.
+    """
+    codes: list = []
+    for station in filter(None, (part.strip() for part in value.split(","))):
+        crs: Optional[str] = STATIONS.canonical(station)
+        if crs is None:
+            raise ValueError(STATIONS.unknown(station))
+        codes.append(crs)
+    return ",".join(codes)
+
+
+def validate_crs(ctx: click.Context, param: click.Parameter, value: str) -> str:
+    """Reject unknown stations before any request is made."""
+    if not STATIONS.is_valid(value):
+        raise click.BadParameter(STATIONS.unknown(value))
+    return value
+
+
+def validate_filter_crs(
+    ctx: click.Context, param: click.Parameter, value: str
+) -> str:
+    """Reject unknown stations in an optional, comma-separated filter."""
+    try:
+        return canonical_filter_crs(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error)) from error
+
+
+def complete_crs(
+    ctx: click.Context, param: click.Parameter, incomplete: str
+) -> List[CompletionItem]:
+    """Complete a CRS code from station codes and names."""
+    return [
+        CompletionItem(crs.lower(), help=name)
+        for crs, name in STATIONS.search(incomplete)
+    ]
+
+
+def refresh(path: str = STATIONS_CSV) -> int:
+    """Download every station from the API and rewrite the index."""
+    # Imported here as nationalrail.nationalrail validates against this module.
+    from .nationalrail import get_json
+
+    stations: list = sorted(
+        (station["crsCode"], station["stationName"]) for station in get_json("/crs")
+    )
+    today: str = datetime.date.today().isoformat()
+    with open(f"{path}.tmp", "w", newline="", encoding="utf-8") as file:
+        file.write(f"# fetched from /crs on {today}\n")
+        csv.writer(file, lineterminator="\n").writerows(stations)
+    os.replace(f"{path}.tmp", path)
+    return len(stations)
+
+
+if __name__ == "__main__":
+    print(f"Wrote {refresh()} stations to {STATIONS_CSV}")
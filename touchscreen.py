@@ -5,7 +5,17 @@ import datetime as dt
 from typing import Tuple
 from PIL import Image, ImageDraw, ImageFont
 
-from nationalrail import Color, Display, Font, Huxley
+from nationalrail import (
+    METRICS,
+    Color,
+    Display,
+    Font,
+    Huxley,
+    HuxleyError,
+    complete_crs,
+    validate_crs,
+)
+from nationalrail.metrics import timed
 
 
 def draw_headers(draw: ImageDraw.ImageDraw, location: str):
@@ -17,15 +27,21 @@ def draw_headers(draw: ImageDraw.ImageDraw, location: str):
     draw.text((400, 432), location, Color.WHITE, Font.INTER_L, anchor="ma")
 
 
-def draw_timestamp(draw: ImageDraw.ImageDraw, generated_at: str) -> None:
-    """Draw timestamp at foot of departure board."""
+def draw_timestamp(
+    draw: ImageDraw.ImageDraw, generated_at: str, stale: bool = False
+) -> None:
+    """Draw timestamp at foot of departure board, marking a stale board."""
     iso_time: dt.datetime = dateutil.parser.isoparse(generated_at)
     time: str = iso_time.strftime("%H:%M:%S")
     page: str = "Page 1 of 1"
     draw.text((Display.RIGHT, 402), time, Color.YELLOW, Font.DOTMATRIX_BOLD_TALL, "rt")
-    draw.text((Display.LEFT, 402), page, Color.YELLOW, Font.DOTMATRIX_BOLD, "lt")
+    if stale:
+        draw_led(draw, (Display.LEFT, 402), "Live updates unavailable")
+    else:
+        draw.text((Display.LEFT, 402), page, Color.YELLOW, Font.DOTMATRIX_BOLD, "lt")
 
 
+@timed("rasterise", part="nrcc_messages")
 def draw_nrcc_messages(draw: ImageDraw.ImageDraw, nrcc_messages: list) -> None:
     """Draw any National Rail Communication Centre (NRCC) messages."""
     offset: int = 60
@@ -38,6 +54,7 @@ def draw_nrcc_messages(draw: ImageDraw.ImageDraw, nrcc_messages: list) -> None:
         draw_led(draw, (Display.WIDTH / 2, offset), line, "mt")
 
 
+@timed("rasterise", part="led_display")
 def draw_led_display(draw: ImageDraw.ImageDraw, lines: int = 10):
     """Draw LED display background texture."""
     for i in range(0, lines):
@@ -57,6 +74,7 @@ def draw_led(
     draw.text(xy=xy, text=text, fill=Color.YELLOW, font=font, anchor=align)
 
 
+@timed("rasterise", part="services")
 def draw_services(draw: ImageDraw.ImageDraw, services: list):
     line: int = 0
     for service in services:
@@ -143,10 +161,12 @@ def draw_station_board(services) -> None:
         message = "Please Check Timetable for Services"
         draw_led(draw, (400, 174), message, "mt")
 
-    draw_timestamp(draw, services.generated_at)
-    img.save("./dist/station.png")
+    draw_timestamp(draw, services.generated_at, services.stale)
+    with METRICS.timer("png_encode"):
+        img.save("./dist/station.png")
 
 
+@timed("layout")
 def get_multiline_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list:
     """Split text into lines of a maximum Display.WIDTH."""
     img = Image.new("RGB", (122, 250))
@@ -169,12 +189,27 @@ def get_multiline_text(text: str, font: ImageFont.FreeTypeFont, max_width: int)
 
 
 @click.command()
-@click.option("--crs", default="wok", help="CRS code for station.")
-def get_departures(crs: str) -> None:
+@click.option(
+    "--crs",
+    default="wok",
+    help="CRS code for station.",
+    callback=validate_crs,
+    shell_complete=complete_crs,
+)
+@click.option("--timings", is_flag=True, help="Print a timing summary to stderr.")
+def get_departures(crs: str, timings: bool) -> None:
     """Display plain-text table of upcoming departures from a named station."""
-    services = Huxley(crs=crs, rows=10, expand=False)
+    METRICS.enabled = METRICS.enabled or timings
+    # draw_services stops after Display.LINES + 1 lines, one service each at most.
+    try:
+        services = Huxley(crs=crs, rows=Display.LINES + 1, expand=False)
+    except HuxleyError as error:
+        raise click.ClickException(str(error)) from error
     draw_station_board(services)
 
+    if timings:
+        click.echo(METRICS.summary(), err=True)
+
 
 if __name__ == "__main__":
     get_departures()  # pylint: disable=no-value-for-parameter